@@ -7,11 +7,13 @@ import (
 	"context"
 	"fmt"
 	"log"
-	"net/http"
 	"sync/atomic"
 	"time"
 
 	"github.com/segmentio/kafka-go"
+	"google.golang.org/grpc"
+	"google.golang.org/grpc/credentials/insecure"
+	healthpb "google.golang.org/grpc/health/grpc_health_v1"
 )
 
 // waitForKafka waits for Kafka to be ready by attempting connections.
@@ -42,37 +44,30 @@ func waitForKafka(brokerAddr string, maxAttempts int) error {
 }
 
 // waitForLiquidityService waits for Liquidity Service to be ready.
-// It checks the HTTP readiness endpoint and uses exponential backoff.
+// It checks the gRPC health service (grpc.health.v1) and uses exponential backoff.
 func waitForLiquidityService(serviceAddr string, maxAttempts int) error {
 	log.Printf("Waiting for Liquidity Service at %s...", serviceAddr)
 
-	// Extract host for HTTP health check
-	host := serviceAddr
-	if len(serviceAddr) > 6 && serviceAddr[len(serviceAddr)-6:] == ":50051" {
-		host = serviceAddr[:len(serviceAddr)-6] + ":8080"
+	conn, err := grpc.Dial(serviceAddr, grpc.WithTransportCredentials(insecure.NewCredentials()))
+	if err != nil {
+		return fmt.Errorf("failed to create health check client: %w", err)
 	}
+	defer conn.Close()
 
-	healthURL := fmt.Sprintf("http://%s/ready", host)
+	healthClient := healthpb.NewHealthClient(conn)
 
 	for attempt := 1; attempt <= maxAttempts; attempt++ {
 		ctx, cancel := context.WithTimeout(context.Background(), 5*time.Second)
 
-		req, err := http.NewRequestWithContext(ctx, "GET", healthURL, nil)
-		if err == nil {
-			resp, err := http.DefaultClient.Do(req)
-			if err == nil {
-				resp.Body.Close()
-				if resp.StatusCode == http.StatusOK {
-					log.Printf("Liquidity Service is ready after %d attempts", attempt)
-					atomic.StoreInt32(&liquidityReady, 1)
-					cancel()
-					return nil
-				}
-			}
-		}
-
+		resp, err := healthClient.Check(ctx, &healthpb.HealthCheckRequest{})
 		cancel()
 
+		if err == nil && resp.GetStatus() == healthpb.HealthCheckResponse_SERVING {
+			log.Printf("Liquidity Service is ready after %d attempts", attempt)
+			atomic.StoreInt32(&liquidityReady, 1)
+			return nil
+		}
+
 		if attempt < maxAttempts {
 			waitTime := time.Duration(attempt) * 2 * time.Second
 			log.Printf("Liquidity Service not ready (attempt %d/%d), retrying in %v...", attempt, maxAttempts, waitTime)
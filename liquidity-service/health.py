@@ -1,100 +1,64 @@
 """
-Health check endpoints for Liquidity Service
-Provides HTTP endpoints for Docker healthchecks and monitoring
+Health checks for Liquidity Service
+Serves the standard gRPC health checking protocol (grpc.health.v1) on the main gRPC port
 """
 
 import logging
-import threading
-import json
-import os
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from datetime import datetime
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
 
 logger = logging.getLogger(__name__)
 
+# Fully-qualified name of the main service, probed alongside the overall ('') status
+SERVICE_NAME = 'liquidity.LiquidityCheckService'
 
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    """HTTP handler for health check endpoints"""
+# Service status flags
+_service_ready = False
+_model_loaded = False
 
-    # Class variables to store service status
-    service_ready = False
-    model_loaded = False
-    start_time = datetime.now()
+# Last published serving status; None until first published
+_serving_status = None
 
-    def log_message(self, format, *args):
-        """Override to use our logger instead of stderr"""
-        logger.debug("%s - %s" % (self.address_string(), format % args))
+# Health servicer holds the current status and answers Check/Watch from the gRPC C-core
+_health_servicer = health.HealthServicer()
 
-    def do_GET(self):
-        """Handle GET requests for /health and /ready"""
 
-        if self.path == '/health':
-            self.handle_health()
-        elif self.path == '/ready':
-            self.handle_ready()
-        else:
-            self.send_error(404, "Not Found")
+def _update_serving_status():
+    """Publish SERVING only when the gRPC server is up and the model is loaded"""
+    global _serving_status
+    if _service_ready and _model_loaded:
+        status = health_pb2.HealthCheckResponse.SERVING
+    else:
+        status = health_pb2.HealthCheckResponse.NOT_SERVING
 
-    def handle_health(self):
-        """Liveness probe - service is running"""
-        uptime = (datetime.now() - self.start_time).total_seconds()
+    # Only publish (and notify Watch streams) on an actual state change
+    if status == _serving_status:
+        return
+    _serving_status = status
 
-        status = {
-            "status": "healthy",
-            "service": "liquidity-service",
-            "timestamp": datetime.now().isoformat(),
-            "uptime_seconds": uptime
-        }
+    _health_servicer.set('', status)
+    _health_servicer.set(SERVICE_NAME, status)
 
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(status).encode())
 
-    def handle_ready(self):
-        """Readiness probe - service can accept traffic"""
-        ready = self.service_ready and self.model_loaded
-
-        status = {
-            "ready": ready,
-            "service": "liquidity-service",
-            "timestamp": datetime.now().isoformat(),
-            "model_loaded": self.model_loaded,
-            "grpc_server_ready": self.service_ready
-        }
-
-        if ready:
-            self.send_response(200)
-        else:
-            self.send_response(503)
-
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(status).encode())
-
-
-def start_health_server(port=8080):
-    """Start health check HTTP server in background thread"""
-    server = HTTPServer(('0.0.0.0', port), HealthCheckHandler)
-
-    def serve():
-        logger.info(f"Health check server starting on port {port}")
-        server.serve_forever()
-
-    thread = threading.Thread(target=serve, daemon=True)
-    thread.start()
-    logger.info(f"Health check endpoints available: http://localhost:{port}/health and /ready")
-
-    return server
+def add_health_servicer(server):
+    """Register the gRPC health service on the given gRPC server"""
+    health_pb2_grpc.add_HealthServicer_to_server(_health_servicer, server)
+    logger.info(f"gRPC health service registered for '' and '{SERVICE_NAME}'")
 
 
 def mark_service_ready(ready=True):
     """Mark gRPC service as ready"""
-    HealthCheckHandler.service_ready = ready
+    global _service_ready
+    _service_ready = ready
+    _update_serving_status()
     logger.info(f"Service readiness set to: {ready}")
 
 
 def mark_model_loaded(loaded=True):
     """Mark ML model as loaded"""
-    HealthCheckHandler.model_loaded = loaded
+    global _model_loaded
+    _model_loaded = loaded
+    _update_serving_status()
     logger.info(f"Model loaded status set to: {loaded}")
+
+
+_update_serving_status()
@@ -7,6 +7,9 @@ import logging
 import sys
 import os
 
+# Use the C-accelerated upb protobuf backend; must be set before any *_pb2 import
+os.environ.setdefault('PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION', 'upb')
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
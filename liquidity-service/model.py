@@ -1,36 +1,93 @@
 """
 Liquidity Prediction Model for Nexus-Lite
-This module implements a liquidity check model using Scikit-Learn for risk prediction.
+This module implements a liquidity check model using a NumPy logistic regression for risk prediction.
 """
 
-import json
+import math
 import os
-from typing import Dict, Tuple
+import sys
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import numpy as np
+import orjson
 import logging
-from datetime import datetime
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of approved transactions retained in history (oldest are overwritten)
+TX_HISTORY_MAXLEN = 100_000
+
+# Cached local hour of day as [computed_at, hour]; refreshed at most every 30s
+_hour_cache = [0.0, 0]
+
+
+def _current_hour() -> int:
+    """Return the local hour of day without a datetime allocation per call."""
+    t = time.time()
+    if t - _hour_cache[0] > 30:
+        _hour_cache[:] = [t, time.localtime(t).tm_hour]
+    return _hour_cache[1]
+
+
+def _fit_logistic_regression(X: np.ndarray, y: np.ndarray, max_iter: int = 30) -> np.ndarray:
+    """
+    Fit an L2-regularized (C=1.0) logistic regression with Newton-Raphson.
+    
+    The intercept is appended as a final unpenalized column, matching the
+    scikit-learn LogisticRegression defaults.
+    
+    Returns:
+        Array of [w_1, ..., w_k, intercept]
+    """
+    Xa = np.column_stack((X, np.ones(len(X))))
+    penalty = np.diag([1.0] * X.shape[1] + [0.0])
+    theta = np.zeros(Xa.shape[1])
+    for _ in range(max_iter):
+        p = 1.0 / (1.0 + np.exp(-(Xa @ theta)))
+        grad = Xa.T @ (p - y) + penalty @ theta
+        H = Xa.T @ ((p * (1.0 - p))[:, None] * Xa) + penalty
+        step = np.linalg.solve(H, grad)
+        theta -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    return theta
+
+
 class LiquidityModel:
     """
-    Liquidity prediction model that checks bank balances and uses Scikit-Learn
-    to predict liquidity risk based on transaction patterns.
+    Liquidity prediction model that checks bank balances and uses a logistic
+    regression to predict liquidity risk based on transaction patterns.
     """
     
     def __init__(self, config_path: str = "/app/config/network.json"):
         """Initialize the liquidity model with bank balances from config."""
         self.bank_balances: Dict[str, float] = {}
+        self._id_canon: Dict[str, str] = {}
         self.load_config(config_path)
         
-        # Track transaction history
-        self.transaction_history: list = []
+        # Per-bank locks guard each balance's read/compare/write
+        self._bank_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
         
-        # ML Components
-        self.clf = LogisticRegression(random_state=42)
-        self.scaler = StandardScaler()
+        # Track transaction history as struct-of-arrays ring buffers
+        self._tx_cap = TX_HISTORY_MAXLEN
+        self._tx_n = 0
+        self._tx_head = 0
+        self._tx_amount = np.empty(self._tx_cap, np.float64)
+        self._tx_prev = np.empty_like(self._tx_amount)
+        self._tx_new = np.empty_like(self._tx_amount)
+        self._tx_ts = np.empty(self._tx_cap, np.int64)
+        self._tx_bank = np.empty(self._tx_cap, np.int32)
+        self._bank_to_idx: Dict[str, int] = {}
+        self._tx_lock = threading.Lock()
+        
+        # ML Components: scaling folded into the logistic weights as plain floats,
+        # z = k_ratio*ratio + k_hour*hour + k0
+        self._k_ratio = 0.0
+        self._k_hour = 0.0
+        self._k0 = 0.0
         self.is_fitted = False
         
         # Train initial model on synthetic data
@@ -39,14 +96,14 @@ class LiquidityModel:
     def load_config(self, path: str):
         """Load bank balances from JSON configuration."""
         try:
-            with open(path, 'r') as f:
-                config = json.load(f)
+            with open(path, 'rb') as f:
+                config = orjson.loads(f.read())
                 
             count = 0
             for bank in config.get('banks', []):
                 # Only load banks that have an initial balance (sources)
                 if 'initial_balance' in bank:
-                    self.bank_balances[bank['id']] = bank['initial_balance']
+                    self.bank_balances[sys.intern(bank['id'])] = bank['initial_balance']
                     count += 1
             
             logger.info(f"Loaded {count} bank balances from {path}")
@@ -55,10 +112,21 @@ class LiquidityModel:
             logger.error(f"Failed to load config from {path}: {e}")
             # Fallback to empty (will cause rejections, which is safe)
             self.bank_balances = {}
+        
+        # Interned canonical IDs, so normalizing a known bank_id needs no new string
+        self._id_canon = {b.upper(): sys.intern(b.upper()) for b in self.bank_balances}
+    
+    def _norm(self, bank_id: str) -> str:
+        """Canonicalize a bank identifier to its interned uppercase form."""
+        canon = self._id_canon.get(bank_id)
+        if canon is None:
+            upper = bank_id.upper()
+            canon = self._id_canon.get(upper, upper)
+        return canon
     
     def _train_initial_model(self):
         """Generate synthetic data and train the initial risk model."""
-        logger.info("Training initial Scikit-Learn liquidity risk model...")
+        logger.info("Training initial liquidity risk model...")
         
         # Generate 1000 synthetic transactions
         # Features: [amount_ratio, hour_of_day]
@@ -76,33 +144,45 @@ class LiquidityModel:
         
         # Feature 2: Hour of day (0-23)
         # Higher risk during non-business hours (e.g., 0-6 AM)
-        hours = np.random.randint(0, 24, n_samples)
+        hours = np.random.randint(0, 24, n_samples, dtype=np.int32)
         
         X = np.column_stack((amount_ratios, hours))
         
         # Generate Targets (Logic: High ratio OR (Medium ratio AND odd hours) -> Risk)
-        y = []
-        for r, h in zip(amount_ratios, hours):
-            risk_prob = r  # Base risk is the ratio
-            if h < 6 or h > 20: # Night time penalty
-                risk_prob += 0.2
-            
-            # If "probability" of failure is high, label as 1 (Risk)
-            y.append(1 if risk_prob > 0.8 else 0)
-            
-        y = np.array(y)
+        # Base risk is the ratio, plus a night time penalty
+        night = (hours < 6) | (hours > 20)
+        risk_prob = amount_ratios + night * 0.2
+        
+        # If "probability" of failure is high, label as 1 (Risk)
+        y = (risk_prob > 0.8).astype(np.int64)
+        
+        # Standardize features
+        mu = X.mean(axis=0)
+        sd = X.std(axis=0)
+        X_scaled = (X - mu) / sd
         
-        # Fit Scaler and Model
-        self.scaler.fit(X)
-        X_scaled = self.scaler.transform(X)
-        self.clf.fit(X_scaled, y)
+        theta = _fit_logistic_regression(X_scaled, y)
+        
+        # Precompute the scalar constants used on the prediction path, so each
+        # request works on Python floats without any ndarray indexing or upcast
+        mu0, mu1 = float(mu[0]), float(mu[1])
+        sd0, sd1 = float(sd[0]), float(sd[1])
+        w0, w1, b = float(theta[0]), float(theta[1]), float(theta[2])
+        self._k_ratio = w0 / sd0
+        self._k_hour = w1 / sd1
+        self._k0 = b - w0 * mu0 / sd0 - w1 * mu1 / sd1
+        
+        # Fresh per-model prediction cache, so a refit never serves stale scores
+        self._risk_cache = lru_cache(maxsize=4096)(self._risk_core)
         self.is_fitted = True
         
-        logger.info(f"Model trained on {n_samples} synthetic samples. Accuracy: {self.clf.score(X_scaled, y):.2f}")
+        accuracy = np.mean(((X_scaled @ theta[:2] + theta[2]) > 0) == y)
+        logger.info(f"Model trained on {n_samples} synthetic samples. Accuracy: {accuracy:.2f}")
 
     def get_all_balances(self) -> Dict[str, float]:
-        """Return all current bank balances."""
-        return self.bank_balances
+        """Return a snapshot of all current bank balances."""
+        # Copy so callers can iterate while credit_bank inserts new banks
+        return dict(self.bank_balances)
 
     def check_liquidity(self, bank_id: str, transaction_amount: float, currency: str = "MYR") -> Tuple[bool, float, str, str]:
         """
@@ -116,8 +196,8 @@ class LiquidityModel:
         Returns:
             Tuple of (approved, available_balance, error_code, error_message)
         """
-        # Normalize bank_id to uppercase
-        bank_id = bank_id.upper()
+        # Normalize bank_id to its canonical uppercase form
+        bank_id = self._norm(bank_id)
         
         # Check if bank exists
         if bank_id not in self.bank_balances:
@@ -128,16 +208,27 @@ class LiquidityModel:
                 f"Account closed: Bank '{bank_id}' not found"
             )
         
-        current_balance = self.bank_balances[bank_id]
+        # Deterministic Check (The Law) - approve and debit atomically per bank
+        with self._bank_locks[bank_id]:
+            current_balance = self.bank_balances[bank_id]
+            approved = current_balance >= transaction_amount
+            if approved:
+                remaining_balance = current_balance - transaction_amount
+                self.bank_balances[bank_id] = remaining_balance
         
         # --- ML Risk Prediction (Non-blocking for Phase 3, but logged) ---
-        risk_score = self.predict_liquidity_risk(bank_id, transaction_amount, current_balance)
+        # Skip the model when the outcome is already certain
+        if current_balance <= 0 or not approved:
+            risk_score = 1.0
+        elif transaction_amount * 5 < current_balance:
+            risk_score = 0.0
+        else:
+            risk_score = self.predict_liquidity_risk(bank_id, transaction_amount, current_balance)
         if risk_score > 0.8:
-            logger.warning(f"High Liquidity Risk Detected for {bank_id}: {risk_score:.2f}")
+            logger.warning("High Liquidity Risk Detected for %s: %.2f", bank_id, risk_score)
         # -----------------------------------------------------------------
 
-        # Deterministic Check (The Law)
-        if current_balance < transaction_amount:
+        if not approved:
             return (
                 False,
                 current_balance,
@@ -145,19 +236,8 @@ class LiquidityModel:
                 f"Insufficient funds: Available {current_balance:.2f} {currency}, Risk Score: {risk_score:.2f}"
             )
         
-        # Transaction approved - update balance and record history
-        remaining_balance = current_balance - transaction_amount
-        self.bank_balances[bank_id] = remaining_balance
-        
-        # Record transaction for future retraining
-        self.transaction_history.append({
-            "bank_id": bank_id,
-            "amount": transaction_amount,
-            "currency": currency,
-            "previous_balance": current_balance,
-            "remaining_balance": remaining_balance,
-            "timestamp": datetime.now()
-        })
+        # Transaction approved - record transaction for future retraining
+        self._record_transaction(bank_id, transaction_amount, current_balance, remaining_balance)
         
         return (
             True,
@@ -166,15 +246,111 @@ class LiquidityModel:
             f"Approved (Risk: {risk_score:.2f})"
         )
     
+    def check_liquidity_batch(self, requests: List[Tuple[str, float, str]]) -> List[Tuple[bool, float, str, str]]:
+        """
+        Check liquidity for a batch of transactions with a single vectorized risk prediction.
+        
+        Balance checks and updates are applied in request order, so the outcome is the
+        same as calling check_liquidity for each request in turn.
+        
+        Args:
+            requests: List of (bank_id, transaction_amount, currency) tuples
+        
+        Returns:
+            List of (approved, available_balance, error_code, error_message) tuples
+        """
+        n = len(requests)
+        results: List[Optional[Tuple[bool, float, str, str]]] = [None] * n
+        # (index, bank_id, amount, currency, current_balance, approved, remaining_balance)
+        settled = []
+        
+        # Deterministic pass (The Law): does not depend on the risk score
+        for i, (bank_id, transaction_amount, currency) in enumerate(requests):
+            bank_id = self._norm(bank_id)
+            if bank_id not in self.bank_balances:
+                results[i] = (
+                    False,
+                    0.0,
+                    "AC04",
+                    f"Account closed: Bank '{bank_id}' not found"
+                )
+                continue
+            
+            remaining_balance = None
+            with self._bank_locks[bank_id]:
+                current_balance = self.bank_balances[bank_id]
+                approved = current_balance >= transaction_amount
+                if approved:
+                    remaining_balance = current_balance - transaction_amount
+                    self.bank_balances[bank_id] = remaining_balance
+            
+            if approved:
+                self._record_transaction(bank_id, transaction_amount, current_balance, remaining_balance)
+            
+            settled.append((i, bank_id, transaction_amount, currency, current_balance, approved, remaining_balance))
+        
+        # Risk pass: same certain-outcome shortcuts as check_liquidity, then one
+        # vectorized prediction over the remaining pre-transaction balances
+        amounts = np.array([item[2] for item in settled], dtype=np.float64)
+        balances = np.array([item[4] for item in settled], dtype=np.float64)
+        approved_mask = np.array([item[5] for item in settled], dtype=bool)
+        
+        certain_reject = ~approved_mask | (balances <= 0)
+        uncertain = ~certain_reject & ~(amounts * 5 < balances)
+        risk_scores = np.zeros(len(settled))
+        risk_scores[certain_reject] = 1.0
+        risk_scores[uncertain] = self.predict_liquidity_risk_batch(amounts[uncertain], balances[uncertain])
+        
+        for (i, bank_id, transaction_amount, currency, current_balance, approved, remaining_balance), risk_score in zip(
+            settled, risk_scores.tolist()
+        ):
+            if risk_score > 0.8:
+                logger.warning("High Liquidity Risk Detected for %s: %.2f", bank_id, risk_score)
+            
+            if not approved:
+                results[i] = (
+                    False,
+                    current_balance,
+                    "AM04",
+                    f"Insufficient funds: Available {current_balance:.2f} {currency}, Risk Score: {risk_score:.2f}"
+                )
+            else:
+                results[i] = (
+                    True,
+                    remaining_balance,
+                    "OK",
+                    f"Approved (Risk: {risk_score:.2f})"
+                )
+        
+        return results
+    
+    def _record_transaction(self, bank_id: str, amount: float, previous_balance: float, remaining_balance: float) -> None:
+        """Append an approved transaction to the history ring buffers, overwriting the oldest when full."""
+        with self._tx_lock:
+            idx = self._bank_to_idx.get(bank_id)
+            if idx is None:
+                idx = self._bank_to_idx[bank_id] = len(self._bank_to_idx)
+        
+            slot = self._tx_head
+            self._tx_amount[slot] = amount
+            self._tx_prev[slot] = previous_balance
+            self._tx_new[slot] = remaining_balance
+            self._tx_ts[slot] = time.time_ns()
+            self._tx_bank[slot] = idx
+            self._tx_head = (slot + 1) % self._tx_cap
+            if self._tx_n < self._tx_cap:
+                self._tx_n += 1
+    
     def get_balance(self, bank_id: str) -> float:
         """Get the current balance for a bank."""
-        bank_id = bank_id.upper()
+        bank_id = self._norm(bank_id)
         return self.bank_balances.get(bank_id, 0.0)
     
     def reset_balance(self, bank_id: str, amount: float) -> None:
         """Reset a bank's balance (useful for testing)."""
-        bank_id = bank_id.upper()
-        self.bank_balances[bank_id] = amount
+        bank_id = self._norm(bank_id)
+        with self._bank_locks[bank_id]:
+            self.bank_balances[bank_id] = amount
 
     def credit_bank(self, bank_id: str, amount: float, currency: str = "MYR") -> Tuple[bool, float, str, str]:
         """
@@ -188,18 +364,20 @@ class LiquidityModel:
         Returns:
             Tuple of (success, new_balance, status_code, message)
         """
-        bank_id = bank_id.upper()
+        bank_id = self._norm(bank_id)
 
-        # Check if bank exists - if not, initialize it
-        if bank_id not in self.bank_balances:
-            self.bank_balances[bank_id] = 0.0
-            logger.info(f"Initialized new bank {bank_id} with 0 balance")
+        with self._bank_locks[bank_id]:
+            # Check if bank exists - if not, initialize it
+            if bank_id not in self.bank_balances:
+                bank_id = self._id_canon[bank_id] = sys.intern(bank_id)
+                self.bank_balances[bank_id] = 0.0
+                logger.info(f"Initialized new bank {bank_id} with 0 balance")
 
-        current_balance = self.bank_balances[bank_id]
-        new_balance = current_balance + amount
-        self.bank_balances[bank_id] = new_balance
+            current_balance = self.bank_balances[bank_id]
+            new_balance = current_balance + amount
+            self.bank_balances[bank_id] = new_balance
 
-        logger.debug(f"Credited {bank_id}: +{amount:.2f} {currency} (New balance: {new_balance:.2f})")
+        logger.debug("Credited %s: +%.2f %s (New balance: %.2f)", bank_id, amount, currency, new_balance)
 
         return (
             True,
@@ -209,15 +387,19 @@ class LiquidityModel:
         )
     
     def get_transaction_count(self, bank_id: str = None) -> int:
-        """Get the count of processed transactions."""
+        """Get the count of processed transactions still retained in history."""
         if bank_id:
-            bank_id = bank_id.upper()
-            return sum(1 for tx in self.transaction_history if tx["bank_id"] == bank_id)
-        return len(self.transaction_history)
+            bank_id = self._norm(bank_id)
+            idx = self._bank_to_idx.get(bank_id)
+            if idx is None:
+                return 0
+            with self._tx_lock:
+                return int(np.count_nonzero(self._tx_bank[:self._tx_n] == idx))
+        return self._tx_n
     
     def predict_liquidity_risk(self, bank_id: str, amount: float = 0.0, current_balance: float = None) -> float:
         """
-        Predict liquidity risk score (0.0 to 1.0) using Scikit-Learn.
+        Predict liquidity risk score (0.0 to 1.0) using the logistic model.
         
         Args:
             bank_id: Bank identifier
@@ -238,15 +420,53 @@ class LiquidityModel:
             
         # Prepare features: [amount_ratio, hour_of_day]
         amount_ratio = amount / current_balance if current_balance > 0 else 1.0
-        hour = datetime.now().hour
+        hour = _current_hour()
         
-        features = np.array([[amount_ratio, hour]])
-        features_scaled = self.scaler.transform(features)
+        # Quantize the ratio to 0.001 (clamped at 2.0, where risk is saturated) for memoization
+        ratio_q = int(min(amount_ratio, 2.0) * 1000)
+        return self._risk_cache(ratio_q, hour)
+    
+    def predict_liquidity_risk_batch(self, amounts: np.ndarray, balances: np.ndarray) -> np.ndarray:
+        """
+        Vectorized risk prediction for many (amount, balance) pairs.
+        
+        Uses the same ratio quantization as predict_liquidity_risk, so each score
+        matches the single-request prediction.
+        
+        Args:
+            amounts: Transaction amounts
+            balances: Balances before each transaction
+        
+        Returns:
+            Array of risk scores (0.0 = safe, 1.0 = high risk)
+        """
+        if not self.is_fitted:
+            return np.full(len(amounts), 0.5)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(balances > 0, amounts / balances, 1.0)
+        ratios = np.trunc(np.minimum(ratios, 2.0) * 1000) / 1000.0
+        
+        z = self._k_ratio * ratios + (self._k_hour * _current_hour() + self._k0)
+        risk = 0.5 * (1.0 + np.tanh(0.5 * z))  # overflow-free sigmoid
+        
+        risk[balances == 0] = 1.0
+        return risk
+    
+    def _risk_core(self, ratio_q: int, hour: int) -> float:
+        """Evaluate the logistic model for a quantized amount ratio and hour of day."""
+        amount_ratio = ratio_q / 1000.0
         
-        # Predict probability of class 1 (High Risk)
-        risk_prob = self.clf.predict_proba(features_scaled)[0][1]
+        # Predict probability of class 1 (High Risk): sigmoid(w.x + b) on standardized features
+        z = self._k_ratio * amount_ratio + self._k_hour * hour + self._k0
+        if z >= 0:
+            risk_prob = 1.0 / (1.0 + math.exp(-z))
+        else:
+            # Numerically stable branch for large negative z (avoids exp overflow)
+            e = math.exp(z)
+            risk_prob = e / (1.0 + e)
         
-        return float(risk_prob)
+        return risk_prob
 
 
 # Global model instance
@@ -20,7 +20,7 @@ import liquidity_pb2
 import liquidity_pb2_grpc
 
 from model import LiquidityModel
-from health import start_health_server, mark_service_ready, mark_model_loaded
+from health import add_health_servicer, mark_service_ready, mark_model_loaded
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +29,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default currency for this demo
+DEFAULT_CURRENCY = sys.intern("MYR")
+
 
 class LiquidityCheckServiceImpl(liquidity_pb2_grpc.LiquidityCheckServiceServicer):
     """
@@ -52,11 +55,11 @@ class LiquidityCheckServiceImpl(liquidity_pb2_grpc.LiquidityCheckServiceServicer
         Returns:
             LiquidityCheckResponse with approval status, balance, and error codes
         """
-        start_time = time.time()
+        t0 = time.perf_counter_ns()
         
         logger.info(
-            f"Liquidity check request - Bank: {request.bank_id}, "
-            f"Amount: {request.transaction_amount} {request.currency}"
+            "Liquidity check request - Bank: %s, Amount: %s %s",
+            request.bank_id, request.transaction_amount, request.currency
         )
         
         # Call the liquidity model
@@ -66,25 +69,61 @@ class LiquidityCheckServiceImpl(liquidity_pb2_grpc.LiquidityCheckServiceServicer
             currency=request.currency
         )
         
-        latency_ms = (time.time() - start_time) * 1000
-        
-        logger.info(
-            f"Liquidity check result - Approved: {approved}, "
-            f"Balance: {available_balance:.2f}, "
-            f"ErrorCode: {error_code}, "
-            f"Latency: {latency_ms:.2f}ms"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            latency_ms = (time.perf_counter_ns() - t0) / 1e6
+            logger.info(
+                "Liquidity check result - Approved: %s, Balance: %.2f, ErrorCode: %s, Latency: %.2fms",
+                approved, available_balance, error_code, latency_ms
+            )
         
         # Build response
-        response = liquidity_pb2.LiquidityCheckResponse(
-            approved=approved,
-            available_balance=available_balance,
-            error_code=error_code,
-            error_message=error_message
-        )
+        response = liquidity_pb2.LiquidityCheckResponse()
+        response.approved = approved
+        response.available_balance = available_balance
+        response.error_code = error_code
+        response.error_message = error_message
         
         return response
 
+    def CheckLiquidityBatch(self, request, context):
+        """
+        Check liquidity for a batch of transactions in a single call.
+
+        Args:
+            request: CheckLiquidityBatchRequest with repeated LiquidityCheckRequest items
+            context: gRPC context
+
+        Returns:
+            CheckLiquidityBatchResponse with one LiquidityCheckResponse per item
+        """
+        t0 = time.perf_counter_ns()
+
+        logger.info("Liquidity check batch request - Items: %d", len(request.items))
+
+        results = self.model.check_liquidity_batch([
+            (item.bank_id, item.transaction_amount, item.currency)
+            for item in request.items
+        ])
+
+        response = liquidity_pb2.CheckLiquidityBatchResponse()
+        approved_count = 0
+        for approved, available_balance, error_code, error_message in results:
+            approved_count += approved
+            result = response.results.add()
+            result.approved = approved
+            result.available_balance = available_balance
+            result.error_code = error_code
+            result.error_message = error_message
+
+        if logger.isEnabledFor(logging.INFO):
+            latency_ms = (time.perf_counter_ns() - t0) / 1e6
+            logger.info(
+                "Liquidity check batch result - Approved: %d/%d, Latency: %.2fms",
+                approved_count, len(results), latency_ms
+            )
+
+        return response
+
     def CreditBank(self, request, context):
         """
         Credit a bank when it receives funds from a transaction.
@@ -96,11 +135,11 @@ class LiquidityCheckServiceImpl(liquidity_pb2_grpc.LiquidityCheckServiceServicer
         Returns:
             CreditBankResponse with success status and new balance
         """
-        start_time = time.time()
+        t0 = time.perf_counter_ns()
 
         logger.info(
-            f"Credit bank request - Bank: {request.bank_id}, "
-            f"Amount: {request.amount} {request.currency}"
+            "Credit bank request - Bank: %s, Amount: %s %s",
+            request.bank_id, request.amount, request.currency
         )
 
         # Call the model's credit method
@@ -110,20 +149,18 @@ class LiquidityCheckServiceImpl(liquidity_pb2_grpc.LiquidityCheckServiceServicer
             currency=request.currency
         )
 
-        latency_ms = (time.time() - start_time) * 1000
+        if logger.isEnabledFor(logging.INFO):
+            latency_ms = (time.perf_counter_ns() - t0) / 1e6
+            logger.info(
+                "Credit bank result - Success: %s, New Balance: %.2f, Latency: %.2fms",
+                success, new_balance, latency_ms
+            )
 
-        logger.info(
-            f"Credit bank result - Success: {success}, "
-            f"New Balance: {new_balance:.2f}, "
-            f"Latency: {latency_ms:.2f}ms"
-        )
-
-        response = liquidity_pb2.CreditBankResponse(
-            success=success,
-            new_balance=new_balance,
-            status_code=status_code,
-            message=message
-        )
+        response = liquidity_pb2.CreditBankResponse()
+        response.success = success
+        response.new_balance = new_balance
+        response.status_code = status_code
+        response.message = message
 
         return response
 
@@ -133,15 +170,15 @@ class LiquidityCheckServiceImpl(liquidity_pb2_grpc.LiquidityCheckServiceServicer
         """
         balances_dict = self.model.get_all_balances()
 
-        balances = []
+        response = liquidity_pb2.GetBalancesResponse()
+        add = response.balances.add
         for bank_id, balance in balances_dict.items():
-            balances.append(liquidity_pb2.BankBalance(
-                bank_id=bank_id,
-                balance=balance,
-                currency="MYR"  # Default currency for this demo
-            ))
+            b = add()
+            b.bank_id = bank_id
+            b.balance = balance
+            b.currency = DEFAULT_CURRENCY
 
-        return liquidity_pb2.GetBalancesResponse(balances=balances)
+        return response
 
 
 def serve(port: int = 50051, max_workers: int = 10, config_path: str = "/app/config/network.json"):
@@ -153,12 +190,11 @@ def serve(port: int = 50051, max_workers: int = 10, config_path: str = "/app/con
         max_workers: Maximum number of worker threads
         config_path: Path to configuration file
     """
-    # Start health check HTTP server
-    health_port = int(os.environ.get('HEALTH_PORT', '8080'))
-    start_health_server(health_port)
-
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
 
+    # Serve grpc.health.v1 on the same port for readiness probes
+    add_health_servicer(server)
+
     # Add the service to the server
     liquidity_pb2_grpc.add_LiquidityCheckServiceServicer_to_server(
         LiquidityCheckServiceImpl(config_path),
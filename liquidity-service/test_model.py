@@ -0,0 +1,127 @@
+"""
+Unit tests for the Liquidity Prediction Model
+Run with: python -m unittest test_model
+"""
+
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import model as model_module
+from model import LiquidityModel, _fit_logistic_regression
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'network.json')
+
+
+class CheckLiquidityBatchTest(unittest.TestCase):
+    """check_liquidity_batch must behave like check_liquidity called item by item"""
+
+    REQUESTS = [
+        ("cimb", 10.0, "MYR"),             # approved, small ratio
+        ("CIMB", 50.0, "MYR"),             # approved, debits the same bank in order
+        ("CIMB", 30.0, "MYR"),             # approved, model-scored ratio
+        ("CIMB", 30.0, "MYR"),             # insufficient funds after earlier debits
+        ("UNKNOWN_BANK", 1.0, "MYR"),      # bank not found
+        ("RHB", 1.0, "MYR"),               # zero balance
+        ("CIMB", float("nan"), "MYR"),     # NaN amount must be rejected
+        ("CIMB", 5.0, "MYR"),              # approved after a rejection
+    ]
+
+    def _fresh_model(self):
+        model = LiquidityModel(CONFIG_PATH)
+        model.reset_balance("CIMB", 100.0)
+        model.reset_balance("RHB", 0.0)
+        return model
+
+    def test_batch_matches_sequential_checks(self):
+        sequential = self._fresh_model()
+        batched = self._fresh_model()
+
+        expected = [sequential.check_liquidity(*request) for request in self.REQUESTS]
+        actual = batched.check_liquidity_batch(self.REQUESTS)
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(batched.get_balance("CIMB"), sequential.get_balance("CIMB"))
+        self.assertEqual(batched.get_transaction_count("CIMB"), sequential.get_transaction_count("CIMB"))
+
+    def test_batch_outcomes(self):
+        results = self._fresh_model().check_liquidity_batch(self.REQUESTS)
+
+        self.assertEqual([r[0] for r in results], [True, True, True, False, False, False, False, True])
+        self.assertEqual([r[2] for r in results], ["OK", "OK", "OK", "AM04", "AC04", "AM04", "AM04", "OK"])
+        self.assertEqual([r[1] for r in results[:4]], [90.0, 40.0, 10.0, 10.0])
+
+    def test_empty_batch(self):
+        self.assertEqual(self._fresh_model().check_liquidity_batch([]), [])
+
+
+class RiskModelFitTest(unittest.TestCase):
+    """The NumPy Newton-Raphson fit must converge and reproduce the seeded model"""
+
+    def test_fit_reaches_regularized_optimum(self):
+        rng = np.random.RandomState(0)
+        X = rng.normal(size=(500, 2))
+        y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.5, size=500) > 0).astype(np.int64)
+
+        theta = _fit_logistic_regression(X, y)
+
+        # Gradient of the L2-regularized (intercept unpenalized) loss vanishes at the optimum
+        Xa = np.column_stack((X, np.ones(len(X))))
+        p = 1.0 / (1.0 + np.exp(-(Xa @ theta)))
+        grad = Xa.T @ (p - y) + np.array([theta[0], theta[1], 0.0])
+        np.testing.assert_allclose(grad, 0.0, atol=1e-8)
+        self.assertGreater(theta[0], theta[1])
+        self.assertGreater(theta[1], 0.0)
+
+    def test_seeded_model_scores(self):
+        model = LiquidityModel(CONFIG_PATH)
+
+        # Known points of the seeded synthetic fit (ratio in thousandths, hour)
+        self.assertAlmostEqual(model._risk_core(100, 12), 0.000231527, places=8)
+        self.assertAlmostEqual(model._risk_core(500, 12), 0.070320141, places=8)
+        self.assertAlmostEqual(model._risk_core(800, 12), 0.853186828, places=8)
+
+        # Risk rises with the amount ratio, and night hours are riskier
+        scores = [model._risk_core(q, 12) for q in range(0, 2001, 100)]
+        self.assertEqual(scores, sorted(scores))
+        self.assertGreater(model._risk_core(800, 2), model._risk_core(800, 12))
+
+
+class TransactionHistoryTest(unittest.TestCase):
+    """Transaction history is a bounded ring buffer; counts cover retained entries only"""
+
+    def test_ring_buffer_wraps_and_counts_per_bank(self):
+        with mock.patch.object(model_module, 'TX_HISTORY_MAXLEN', 5):
+            model = LiquidityModel(CONFIG_PATH)
+
+        for _ in range(4):
+            model.check_liquidity("CIMB", 1.0)
+        self.assertEqual(model.get_transaction_count(), 4)
+        self.assertEqual(model.get_transaction_count("cimb"), 4)
+
+        # Three more approvals wrap the buffer and overwrite the three oldest CIMB entries
+        model.check_liquidity("RHB", 1.0)
+        model.check_liquidity("RHB", 1.0)
+        model.check_liquidity("MAYBANK", 1.0)
+
+        self.assertEqual(model._tx_head, 2)
+        self.assertEqual(model.get_transaction_count(), 5)
+        self.assertEqual(model.get_transaction_count("CIMB"), 2)
+        self.assertEqual(model.get_transaction_count("RHB"), 2)
+        self.assertEqual(model.get_transaction_count("MAYBANK"), 1)
+        self.assertEqual(model.get_transaction_count("DBS"), 0)
+
+    def test_rejections_are_not_recorded(self):
+        model = LiquidityModel(CONFIG_PATH)
+        model.reset_balance("CIMB", 1.0)
+
+        model.check_liquidity("CIMB", 5.0)
+        model.check_liquidity("UNKNOWN_BANK", 1.0)
+
+        self.assertEqual(model.get_transaction_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()